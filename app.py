@@ -2,13 +2,28 @@ import streamlit as st
 import pandas as pd
 import numpy as np
 import datetime
+import hashlib
+import os
 import random
+import tempfile
+from pathlib import Path
 import plotly.express as px
+import plotly.io as pio
+
+# numba is an optional extra and deliberately not in requirements.txt. The NumPy sampler
+# (_simulate_sales_numpy) is the supported path. The JIT kernel is not faster at this data
+# size and nothing checks it against the sampler, so keep the two in sync by hand.
+try:
+    from numba import njit, prange
+    HAS_NUMBA = True
+except ImportError:
+    HAS_NUMBA = False
 
 # ---------------------------
 # PAGE CONFIG & STYLING
 # ---------------------------
 st.set_page_config(page_title="Beauty Business Dashboard", layout="wide")
+pio.json.config.default_engine = "orjson"  # Native encoder for every st.plotly_chart payload
 
 st.image("Sapiendata.png", width=120)
 st.markdown("""
@@ -19,17 +34,91 @@ st.markdown("""
 
 # HELPERS
 
-def generate_seasonal_multiplier(date):
-    day_of_year = date.timetuple().tm_yday
-    return 1 + 0.25 * np.sin(2 * np.pi * (day_of_year / 365) - np.pi / 2)  # Peak in spring/summer
+_RNG = np.random.default_rng()
+
+def generate_seasonal_multiplier(dates):
+    day_of_year = dates.dayofyear.to_numpy()
+    return 1.0 + 0.25 * np.sin(2 * np.pi * day_of_year / 365.0 - np.pi / 2)  # Peak in spring/summer
 
 def clamp(x, lo, hi):
     return max(lo, min(hi, x))
 
+def _simulate_sales_numpy(seeds, brand_starts, cat_weights, base_prices, cat_sizes, cat_offsets,
+                          channel_p, offer_p):
+    # Category weights only depend on the brand, so each brand's orders are drawn in one pass
+    parts = []
+    for b in range(len(seeds)):
+        rng = np.random.default_rng(seeds[b])
+        n = brand_starts[b + 1] - brand_starts[b]
+        cats_idx = rng.choice(len(base_prices), size=n, p=cat_weights[b])
+        prods_idx = cat_offsets[cats_idx] + rng.integers(0, cat_sizes[cats_idx])
+        channels_idx = rng.choice(len(channel_p), size=n, p=channel_p)
+        offers_idx = rng.choice(len(offer_p), size=n, p=offer_p)
+
+        base = base_prices[cats_idx]
+        prices = np.clip(rng.normal(base, base * 0.15), base * 0.6, base * 1.5).round(2)
+        qty = np.maximum(1, rng.exponential(1.5, size=n).astype(np.int64))
+        parts.append((cats_idx, prods_idx, channels_idx, offers_idx, qty, prices))
+    return tuple(np.concatenate(col) for col in zip(*parts))
+
+if HAS_NUMBA:
+    @njit(parallel=True, nogil=True, cache=True)
+    def _simulate_sales_numba(seeds, brand_starts, cat_weights, base_prices, cat_sizes, cat_offsets,
+                              channel_p, offer_p):
+        total = brand_starts[-1]
+        cats_idx = np.empty(total, np.int64)
+        prods_idx = np.empty(total, np.int64)
+        channels_idx = np.empty(total, np.int64)
+        offers_idx = np.empty(total, np.int64)
+        qty = np.empty(total, np.int64)
+        prices = np.empty(total, np.float64)
+
+        channel_cum = np.cumsum(channel_p)
+        offer_cum = np.cumsum(offer_p)
+        for b in prange(len(seeds)):
+            np.random.seed(seeds[b])
+            cat_cum = np.cumsum(cat_weights[b])
+            for k in range(brand_starts[b], brand_starts[b + 1]):
+                c = min(np.searchsorted(cat_cum, np.random.random(), side="right"), len(cat_cum) - 1)
+                cats_idx[k] = c
+                prods_idx[k] = cat_offsets[c] + np.random.randint(0, cat_sizes[c])
+                channels_idx[k] = min(np.searchsorted(channel_cum, np.random.random(), side="right"),
+                                      len(channel_cum) - 1)
+                offers_idx[k] = min(np.searchsorted(offer_cum, np.random.random(), side="right"),
+                                    len(offer_cum) - 1)
+
+                base = base_prices[c]
+                price = min(max(np.random.normal(base, base * 0.15), base * 0.6), base * 1.5)
+                prices[k] = round(price, 2)
+                qty[k] = max(1, int(np.random.exponential(1.5)))
+        return cats_idx, prods_idx, channels_idx, offers_idx, qty, prices
+
+    simulate_sales = _simulate_sales_numba
+else:
+    simulate_sales = _simulate_sales_numpy
+
+def filter_bounds(start_filter, end_filter):
+    # Half-open [lo, hi) bounds keep the comparison on the datetime64 buffer
+    return pd.Timestamp(start_filter), pd.Timestamp(end_filter) + pd.Timedelta(days=1)
+
+def date_mask(dates, lo, hi):
+    values = dates.to_numpy()
+    return (values >= lo.to_datetime64()) & (values < hi.to_datetime64())
+
+def category_mask(col, selected):
+    codes = col.cat.categories.get_indexer(selected)
+    return np.isin(col.cat.codes.to_numpy(), codes[codes >= 0].astype(col.cat.codes.dtype))
+
+def filter_frame(df, lo, hi, brands, campaigns=None):
+    # Most selective first: date range, then brand, then campaign
+    masks = [date_mask(df["Date"], lo, hi), category_mask(df["Brand"], brands)]
+    if campaigns is not None:
+        masks.append(category_mask(df["Campaign"], campaigns))
+    return df.loc[np.logical_and.reduce(masks)]
+
 
 # MOCK DATA GENERATION INCLUDING CAMPAIGNS
 
-@st.cache_data
 def generate_mock_data(start_date, days=90, brands=None):
     if brands is None:
         brands = ["Radiance", "GlowUp", "PureBeauty"]
@@ -47,62 +136,55 @@ def generate_mock_data(start_date, days=90, brands=None):
     social_platforms = ["Instagram", "Facebook", "TikTok", "YouTube"]
     offers = ["None", "10% Off", "Buy 1 Get 1", "Free Gift"]
     campaigns = ["Summer Glow", "Holiday Sparkle", "Winter Warmth", "Spring Fresh", "Loyalty Boost"]
-
-    dates = pd.date_range(start=start_date, periods=days).tolist()
-
-    sales_records = []
-    marketing_records = []
-    social_records = []
-    reviews_records = []
-
-    for brand in brands:
-        followers = {p: random.randint(5000, 15000) for p in social_platforms}
-
-        for date in dates:
-            seasonal_mult = generate_seasonal_multiplier(date)
-            weekday_factor = 1.1 if date.weekday() in [4,5] else 0.9
-            daily_orders = int(clamp(np.random.normal(80 * seasonal_mult * weekday_factor, 15), 40, 150))
-
-            # Assign campaign per day randomly (simulate active campaigns)
-            active_campaign = random.choice(campaigns)
-
-            for _ in range(daily_orders):
-                cat_weights = {
-                    "Radiance": [0.4, 0.3, 0.15, 0.1, 0.05],
-                    "GlowUp": [0.3, 0.4, 0.1, 0.1, 0.1],
-                    "PureBeauty": [0.25, 0.25, 0.3, 0.1, 0.1]
-                }
-                cats = list(categories.keys())
-                cat = random.choices(cats, weights=cat_weights[brand])[0]
-                prod = random.choice(categories[cat])
-                channel = random.choices(channels, weights=[0.6, 0.3, 0.1])[0]
-                offer = random.choices(offers, weights=[0.7, 0.15, 0.1, 0.05])[0]
-
-                base_price = {
-                    "Skincare": 45,
-                    "Makeup": 35,
-                    "Haircare": 30,
-                    "Fragrance": 75,
-                    "Body": 25
-                }[cat]
-                price = round(np.random.normal(base_price, base_price * 0.15), 2)
-                price = clamp(price, base_price * 0.6, base_price * 1.5)
-
-                qty = max(1, int(np.random.exponential(1.5)))
-
-                revenue = round(price * qty, 2)
-                sales_records.append({
-                    "Brand": brand,
-                    "Date": date,
-                    "Category": cat,
-                    "Product": prod,
-                    "Channel": channel,
-                    "Offer": offer,
-                    "Campaign": active_campaign,
-                    "Qty": qty,
-                    "UnitPrice": price,
-                    "Revenue": revenue
-                })
+    sentiments = ["Positive", "Neutral", "Negative"]
+
+    dates = pd.date_range(start=start_date, periods=days)
+    season = generate_seasonal_multiplier(dates)
+    weekday_factors = np.where(dates.weekday.isin([4, 5]), 1.1, 0.9)
+    date_values = dates.to_numpy()
+    dates = dates.tolist()
+    n_brands, n_days = len(brands), len(dates)
+
+    cats = list(categories.keys())
+    cat_weights = {
+        "Radiance": [0.4, 0.3, 0.15, 0.1, 0.05],
+        "GlowUp": [0.3, 0.4, 0.1, 0.1, 0.1],
+        "PureBeauty": [0.25, 0.25, 0.3, 0.1, 0.1]
+    }
+    brand_cat_weights = np.array([cat_weights[brand] for brand in brands])
+    base_prices = np.array([45, 35, 30, 75, 25], dtype=float)  # Same order as cats
+
+    # Flattened product table: category i owns products[offsets[i]:offsets[i] + sizes[i]]
+    products = np.array([p for c in cats for p in categories[c]])
+    cat_sizes = np.array([len(categories[c]) for c in cats])
+    cat_offsets = np.concatenate(([0], np.cumsum(cat_sizes)[:-1]))
+
+    rng = np.random.default_rng()
+
+    # Daily order volume and active campaign for every (brand, day)
+    order_counts = np.clip(
+        rng.normal(80 * season * weekday_factors, 15, size=(n_brands, n_days)), 40, 150
+    ).astype(np.int64)
+    campaign_codes = rng.integers(0, len(campaigns), size=(n_brands, n_days))
+
+    # Sales rows are laid out brand-major, then by day; brand b owns rows brand_starts[b]:brand_starts[b + 1]
+    brand_starts = np.concatenate(([0], np.cumsum(order_counts.sum(axis=1))))
+    cats_idx, prods_idx, channels_idx, offers_idx, qty, prices = simulate_sales(
+        rng.integers(0, 2**31 - 1, size=n_brands), brand_starts, brand_cat_weights, base_prices,
+        cat_sizes, cat_offsets, np.array([0.6, 0.3, 0.1]), np.array([0.7, 0.15, 0.1, 0.05])
+    )
+    rows_per_day = order_counts.ravel()
+
+    # Column-oriented accumulators, one scalar per row
+    marketing_records = {col: [] for col in [
+        "Brand", "Date", "Channel", "Campaign", "Traffic", "CTR", "CPC"
+    ]}
+    reviews_records = {col: [] for col in ["Brand", "Date", "Sentiment", "Rating"]}
+
+    for b, brand in enumerate(brands):
+        for i, date in enumerate(dates):
+            seasonal_mult = season[i]
+            active_campaign = campaigns[campaign_codes[b, i]]
 
             # Marketing with campaign attribution
             for mkt_channel in marketing_channels:
@@ -114,33 +196,17 @@ def generate_mock_data(start_date, days=90, brands=None):
                 }[mkt_channel]
                 traffic = int(clamp(np.random.normal(base_traffic * seasonal_mult, base_traffic * 0.1), 100, 5000))
                 ctr = round(np.random.uniform(0.3, 4.5), 2)
-                cpc = round(np.random.uniform(0.3, 2.0), 2) if mkt_channel == "Paid" else None
-
-                marketing_records.append({
-                    "Brand": brand,
-                    "Date": date,
-                    "Channel": mkt_channel,
-                    "Campaign": active_campaign,
-                    "Traffic": traffic,
-                    "CTR": ctr,
-                    "CPC": cpc,
-                })
-
-            # Social Media
-            for platform in social_platforms:
-                followers[platform] = int(followers[platform] * np.random.uniform(1.0005, 1.003))
-                engagement_rate = round(np.random.uniform(0.5, 8.5), 2)
-
-                social_records.append({
-                    "Brand": brand,
-                    "Date": date,
-                    "Platform": platform,
-                    "EngagementRate": engagement_rate,
-                    "Followers": followers[platform]
-                })
+                cpc = round(np.random.uniform(0.3, 2.0), 2) if mkt_channel == "Paid" else np.nan
+
+                marketing_records["Brand"].append(brand)
+                marketing_records["Date"].append(date)
+                marketing_records["Channel"].append(mkt_channel)
+                marketing_records["Campaign"].append(active_campaign)
+                marketing_records["Traffic"].append(traffic)
+                marketing_records["CTR"].append(ctr)
+                marketing_records["CPC"].append(cpc)
 
         # Reviews
-        sentiments = ["Positive", "Neutral", "Negative"]
         sentiment_weights = [0.7, 0.2, 0.1]
         review_dates = random.choices(dates, k=120)
         for review_date in review_dates:
@@ -148,23 +214,154 @@ def generate_mock_data(start_date, days=90, brands=None):
             rating_map = {"Positive": random.randint(4,5), "Neutral": 3, "Negative": random.randint(1,2)}
             rating = rating_map[sentiment]
 
-            reviews_records.append({
-                "Brand": brand,
-                "Date": review_date,
-                "Sentiment": sentiment,
-                "Rating": rating
-            })
-
-    sales_df = pd.DataFrame(sales_records)
-    marketing_df = pd.DataFrame(marketing_records)
-    social_df = pd.DataFrame(social_records)
-    reviews_df = pd.DataFrame(reviews_records)
+            reviews_records["Brand"].append(brand)
+            reviews_records["Date"].append(review_date)
+            reviews_records["Sentiment"].append(sentiment)
+            reviews_records["Rating"].append(rating)
+
+    sales_df = pd.DataFrame({
+        "Brand": pd.Categorical.from_codes(
+            np.repeat(np.arange(n_brands, dtype=np.int8), order_counts.sum(axis=1)), categories=brands),
+        "Date": np.repeat(np.tile(date_values, n_brands), rows_per_day),
+        "Category": pd.Categorical.from_codes(cats_idx.astype(np.int8), categories=cats),
+        "Product": pd.Categorical.from_codes(prods_idx.astype(np.int8), categories=products),
+        "Channel": pd.Categorical.from_codes(channels_idx.astype(np.int8), categories=channels),
+        "Offer": pd.Categorical.from_codes(offers_idx.astype(np.int8), categories=offers),
+        "Campaign": pd.Categorical.from_codes(
+            np.repeat(campaign_codes.ravel().astype(np.int8), rows_per_day), categories=campaigns),
+        "Qty": qty,
+        "UnitPrice": prices,
+        "Revenue": (prices * qty).round(2),
+    })
+    marketing_df = pd.DataFrame({
+        col: np.asarray(vals) for col, vals in marketing_records.items()
+    })
+
+    # Social Media: compound daily follower growth per (brand, platform), shape (brands, days, platforms)
+    n_platforms = len(social_platforms)
+    start_followers = rng.integers(5000, 15000, size=(n_brands, 1, n_platforms), endpoint=True)
+    growth = rng.uniform(1.0005, 1.003, size=(n_brands, n_days, n_platforms))
+    followers = (start_followers * np.cumprod(growth, axis=1)).astype(np.int32)
+    engagement = rng.uniform(0.5, 8.5, size=(n_brands, n_days, n_platforms)).round(2)
+    social_df = pd.DataFrame({
+        "Brand": pd.Categorical.from_codes(
+            np.repeat(np.arange(n_brands, dtype=np.int8), n_days * n_platforms), categories=brands),
+        "Date": np.tile(np.repeat(date_values, n_platforms), n_brands),
+        "Platform": pd.Categorical.from_codes(
+            np.tile(np.arange(n_platforms, dtype=np.int8), n_brands * n_days), categories=social_platforms),
+        "EngagementRate": engagement.ravel(),
+        "Followers": followers.ravel(),
+    })
+    reviews_df = pd.DataFrame({col: np.asarray(vals) for col, vals in reviews_records.items()})
+
+    # Low-cardinality string columns as Categoricals (int8 codes instead of Python strings)
+    for df, cat_cols in [
+        (marketing_df, {"Brand": brands, "Channel": marketing_channels, "Campaign": campaigns}),
+        (reviews_df, {"Brand": brands, "Sentiment": sentiments}),
+    ]:
+        for col, values in cat_cols.items():
+            df[col] = pd.Categorical(df[col], categories=values)
 
     for df in [sales_df, marketing_df, social_df, reviews_df]:
         df["Date"] = pd.to_datetime(df["Date"])
 
+    # Narrow numeric dtypes: halves the bytes moved through groupbys and shipped to Plotly
+    sales_df = sales_df.astype({"Revenue": "float32", "UnitPrice": "float32", "Qty": "int16"})
+    marketing_df = marketing_df.astype({"Traffic": "int32", "CTR": "float32", "CPC": "float32"})
+    social_df = social_df.astype({"EngagementRate": "float32", "Followers": "int32"})
+    reviews_df = reviews_df.astype({"Rating": "int8"})
+
+    return sales_df, marketing_df, social_df, reviews_df, campaigns
+
+
+# ON-DISK CACHE OF THE MOCK DATA (survives worker restarts; st.cache_data only lives per process)
+
+MOCK_TABLES = ["sales", "marketing", "social", "reviews"]
+# Bump whenever generate_mock_data changes its output (columns, dtypes, distributions)
+MOCK_SCHEMA_VERSION = 1
+MOCK_CACHE_DIR = Path(tempfile.gettempdir()) / "beautyapp_mock_data"
+
+def mock_data_key(start_date, days, brands):
+    # hashlib rather than hash(): str hashes are salted per process
+    key_src = repr((MOCK_SCHEMA_VERSION, start_date.isoformat(), days, tuple(brands or ())))
+    return hashlib.sha1(key_src.encode()).hexdigest()[:16]
+
+def mock_data_paths(key):
+    return {name: MOCK_CACHE_DIR / f"bd_{key}_{name}.parquet" for name in MOCK_TABLES}
+
+def prune_mock_data(key):
+    # start_date moves daily, so every older key is stale once a new one is written.
+    # Only finished *.parquet files: another worker's in-flight .tmp may belong to a newer key
+    for path in MOCK_CACHE_DIR.glob("bd_*.parquet"):
+        if not path.name.startswith(f"bd_{key}_"):
+            path.unlink(missing_ok=True)
+
+@st.cache_data
+def load_mock_data(start_date, days=90, brands=None):
+    key = mock_data_key(start_date, days, brands)
+    paths = mock_data_paths(key)
+    if all(path.exists() for path in paths.values()):
+        try:
+            sales_df, marketing_df, social_df, reviews_df = (
+                pd.read_parquet(paths[name], engine="pyarrow") for name in MOCK_TABLES
+            )
+        except FileNotFoundError:  # Pruned by another worker between exists() and read
+            pass
+        else:
+            campaigns = sales_df["Campaign"].cat.categories.tolist()
+            return sales_df, marketing_df, social_df, reviews_df, campaigns
+
+    sales_df, marketing_df, social_df, reviews_df, campaigns = generate_mock_data(start_date, days, brands)
+    MOCK_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+    for name, df in zip(MOCK_TABLES, [sales_df, marketing_df, social_df, reviews_df]):
+        # Write then rename so a concurrent reader never sees a partial file
+        tmp_path = paths[name].with_suffix(f".{os.getpid()}.tmp")
+        df.to_parquet(tmp_path, engine="pyarrow", compression="zstd", index=False)
+        os.replace(tmp_path, paths[name])
+    prune_mock_data(key)
     return sales_df, marketing_df, social_df, reviews_df, campaigns
 
+
+# SALES AGGREGATIONS (memoized per filter selection)
+
+# Bounded: every brand x campaign x date-range selection would otherwise stay resident
+@st.cache_data(max_entries=32)
+def agg_sales(sales_df, brands, campaigns, start_filter, end_filter):
+    lo, hi = filter_bounds(start_filter, end_filter)
+    sales_df = filter_frame(sales_df, lo, hi, list(brands), list(campaigns))
+
+    # Without Date the rollup is capped at a few hundred groups; the category, product,
+    # channel and offer views roll up this small frame
+    rollup = sales_df.groupby(
+        ["Brand", "Category", "Product", "Channel", "Offer"], observed=True, sort=False
+    )[["Revenue", "Qty"]].sum()
+
+    cat_brand = rollup.groupby(
+        level=["Brand", "Category"], observed=True, sort=False
+    )["Revenue"].sum().reset_index().sort_values(["Brand", "Category"])
+    # Partial sort per brand; brands are already filtered above. nlargest drops the
+    # Brand/Product index names on an empty Series, so that case passes through as-is
+    product_rev = rollup.groupby(level=["Brand", "Product"], observed=True, sort=False)["Revenue"].sum()
+    if not product_rev.empty:
+        product_rev = product_rev.groupby(
+            level="Brand", observed=True, sort=False, group_keys=False
+        ).nlargest(10)
+    top_products = product_rev.reset_index()
+    ch_rev = rollup.groupby(
+        level=["Brand", "Channel"], observed=True, sort=False
+    )["Revenue"].sum().reset_index().sort_values(["Brand", "Channel"])
+    # Single-metric views stay Series; the charts plot their index/values directly
+    seasonal = sales_df.groupby("Date")["Revenue"].sum()
+    offer = rollup.groupby(level="Offer", observed=True, sort=False)["Revenue"].sum()
+
+    return {
+        "cat_brand": cat_brand,
+        "top_products": top_products,
+        "ch_rev": ch_rev,
+        "seasonal": seasonal,
+        "offer": offer,
+    }
+
 # ---------------------------
 # SIDEBAR FILTERS
 # ---------------------------
@@ -184,7 +381,7 @@ else:
     start_filter, end_filter = start_date, today
 
 # Load data with campaigns
-sales_df, marketing_df, social_df, reviews_df, campaigns = generate_mock_data(start_date, days=(today - start_date).days + 1, brands=brands_available)
+sales_df, marketing_df, social_df, reviews_df, campaigns = load_mock_data(start_date, days=(today - start_date).days + 1, brands=brands_available)
 
 # Campaign filter (sidebar)
 selected_campaigns = st.sidebar.multiselect("Select Campaigns", options=campaigns, default=campaigns)
@@ -192,31 +389,17 @@ selected_campaigns = st.sidebar.multiselect("Select Campaigns", options=campaign
 # ---------------------------
 # FILTER DATA
 # ---------------------------
-sales_df = sales_df[
-    (sales_df["Brand"].isin(selected_brands)) &
-    (sales_df["Campaign"].isin(selected_campaigns)) &
-    (sales_df["Date"].dt.date >= start_filter) &
-    (sales_df["Date"].dt.date <= end_filter)
-]
-
-marketing_df = marketing_df[
-    (marketing_df["Brand"].isin(selected_brands)) &
-    (marketing_df["Campaign"].isin(selected_campaigns)) &
-    (marketing_df["Date"].dt.date >= start_filter) &
-    (marketing_df["Date"].dt.date <= end_filter)
-]
-
-social_df = social_df[
-    (social_df["Brand"].isin(selected_brands)) &
-    (social_df["Date"].dt.date >= start_filter) &
-    (social_df["Date"].dt.date <= end_filter)
-]
-
-reviews_df = reviews_df[
-    (reviews_df["Brand"].isin(selected_brands)) &
-    (reviews_df["Date"].dt.date >= start_filter) &
-    (reviews_df["Date"].dt.date <= end_filter)
-]
+# Sales chart aggregations come from the unfiltered frame, cached per selection
+sales_aggs = agg_sales(
+    sales_df, tuple(selected_brands), tuple(selected_campaigns), start_filter, end_filter
+)
+
+lo, hi = filter_bounds(start_filter, end_filter)
+
+sales_df = filter_frame(sales_df, lo, hi, selected_brands, selected_campaigns)
+marketing_df = filter_frame(marketing_df, lo, hi, selected_brands, selected_campaigns)
+social_df = filter_frame(social_df, lo, hi, selected_brands)
+reviews_df = filter_frame(reviews_df, lo, hi, selected_brands)
 
 # ---------------------------
 # DASHBOARD
@@ -244,7 +427,7 @@ col6.metric("Marketing ROI (x)", f"{mkt_roi}")
 
 # SALES & REVENUE
 st.subheader("Sales & Revenue")
-cat_brand_rev = sales_df.groupby(["Brand", "Category"])["Revenue"].sum().reset_index()
+cat_brand_rev = sales_aggs["cat_brand"]
 fig_cat_brand = px.bar(
     cat_brand_rev, x="Category", y="Revenue", color="Brand",
     title="Revenue by Category & Brand", barmode="group",
@@ -252,45 +435,49 @@ fig_cat_brand = px.bar(
 st.plotly_chart(fig_cat_brand, use_container_width=True)
 
 st.markdown("### Top Products by Revenue")
-top_products = sales_df.groupby(["Brand", "Product"])["Revenue"].sum().reset_index()
-top_products = top_products.sort_values("Revenue", ascending=False).groupby("Brand").head(10)
-top_products = top_products[top_products["Brand"].isin(selected_brands)]
+top_products = sales_aggs["top_products"]
 fig_top_prod = px.bar(
     top_products, x="Product", y="Revenue", color="Brand",
     title="Top 10 Products by Revenue per Brand",
     color_discrete_sequence=px.colors.sequential.RdPu)
 st.plotly_chart(fig_top_prod, use_container_width=True)
 
-ch_rev = sales_df.groupby(["Brand", "Channel"])["Revenue"].sum().reset_index()
+ch_rev = sales_aggs["ch_rev"]
 fig_ch = px.bar(
     ch_rev, x="Channel", y="Revenue", color="Brand",
     title="Revenue by Sales Channel & Brand", barmode="group",
     color_discrete_sequence=px.colors.sequential.RdPu)
 st.plotly_chart(fig_ch, use_container_width=True)
 
-seasonal_rev = sales_df.groupby("Date")["Revenue"].sum().reset_index()
+seasonal_rev = sales_aggs["seasonal"]
 fig_seasonal = px.line(
-    seasonal_rev, x="Date", y="Revenue",
+    seasonal_rev.to_frame(), y="Revenue",
     title="Seasonal Revenue Trends Over Time",
     color_discrete_sequence=["#d63384"])
 st.plotly_chart(fig_seasonal, use_container_width=True)
 
-offer_rev = sales_df.groupby("Offer")["Revenue"].sum().reset_index()
+offer_rev = sales_aggs["offer"]
 fig_offer = px.pie(
-    offer_rev, values="Revenue", names="Offer",
+    values=offer_rev.values, names=offer_rev.index, labels={"values": "Revenue", "names": "Offer"},
     title="Revenue Distribution by Promotion Type",
     color_discrete_sequence=px.colors.sequential.RdPu)
 st.plotly_chart(fig_offer, use_container_width=True)
 
 # MARKETING PERFORMANCE
 st.subheader("Marketing Performance")
+# Hand Plotly only the columns each chart draws, not the transactional frame
+traffic_plot_df = marketing_df.groupby(
+    ["Date", "Channel", "Brand"], observed=True, sort=False
+)["Traffic"].sum().reset_index()
 fig_marketing_traffic = px.line(
-    marketing_df, x="Date", y="Traffic", color="Channel",
+    traffic_plot_df, x="Date", y="Traffic", color="Channel",
     line_dash="Brand", title="Website Traffic by Channel & Brand",
     color_discrete_sequence=px.colors.sequential.RdPu)
 st.plotly_chart(fig_marketing_traffic, use_container_width=True)
 
-paid_ads = marketing_df[marketing_df["Channel"] == "Paid"]
+paid_ads = marketing_df[marketing_df["Channel"] == "Paid"].groupby(
+    ["Date", "Brand"], observed=True, sort=False
+)[["CTR", "CPC"]].mean().reset_index()
 fig_ctr = px.line(
     paid_ads, x="Date", y="CTR", color="Brand",
     title="Paid Ad CTR Over Time",
@@ -304,7 +491,9 @@ fig_cpc = px.line(
 st.plotly_chart(fig_cpc, use_container_width=True)
 
 # Campaign Traffic Summary
-campaign_traffic = marketing_df.groupby(["Campaign", "Channel"])["Traffic"].sum().reset_index()
+campaign_traffic = marketing_df.groupby(
+    ["Campaign", "Channel"], observed=True, sort=False
+)["Traffic"].sum().reset_index().sort_values(["Campaign", "Channel"])
 fig_campaign_traffic = px.bar(
     campaign_traffic, x="Campaign", y="Traffic", color="Channel",
     title="Total Traffic by Campaign & Channel",
@@ -314,10 +503,10 @@ st.plotly_chart(fig_campaign_traffic, use_container_width=True)
 
 # Email Campaign Performance (Open Rate & CTR simulated)
 email_campaigns = marketing_df[marketing_df["Channel"] == "Email"]
-email_campaign_summary = email_campaigns.groupby("Campaign").agg({
+email_campaign_summary = email_campaigns.groupby("Campaign", observed=True, sort=False).agg({
     "Traffic": "sum",
     "CTR": "mean"
-}).reset_index()
+}).reset_index().sort_values("Campaign")
 email_campaign_summary["Open Rate (%)"] = email_campaign_summary["CTR"] * random.uniform(20,40) / 100  # simulated
 email_campaign_summary["Conversion Rate (%)"] = email_campaign_summary["CTR"] * random.uniform(5,15) / 100  # simulated
 
@@ -340,15 +529,17 @@ col1.metric("Loyalty Program Participation", f"{loyalty_rate}%")
 col2.metric("Repeat Purchase Rate", f"{repeat_purchase_rate}%")
 
 # New vs Returning Customers (simulated)
-sales_df["IsNewCustomer"] = np.random.choice([True, False], size=len(sales_df), p=[0.35, 0.65])
-new_customers = sales_df[sales_df["IsNewCustomer"]].groupby("Date").size().cumsum()
-returning_customers = sales_df[~sales_df["IsNewCustomer"]].groupby("Date").size().cumsum()
-
-cust_trends = pd.DataFrame({
-    "Date": new_customers.index,
-    "New Customers": new_customers.values,
-    "Returning Customers": returning_customers.reindex(new_customers.index, fill_value=0).values
-}).melt(id_vars="Date", var_name="Customer Type", value_name="Count")
+sales_df["IsNewCustomer"] = _RNG.random(len(sales_df)) < 0.35
+cust_counts = (
+    sales_df.groupby(["Date", "IsNewCustomer"], observed=True).size()
+    .unstack(fill_value=0)
+    .reindex(columns=[True, False], fill_value=0)
+    .sort_index()
+    .cumsum()
+    .rename(columns={True: "New Customers", False: "Returning Customers"})
+    .rename_axis(index="Date", columns=None)  # Keep the name when the selection is empty
+)
+cust_trends = cust_counts.reset_index().melt(id_vars="Date", var_name="Customer Type", value_name="Count")
 
 fig_cust = px.line(
     cust_trends, x="Date", y="Count", color="Customer Type",
@@ -359,7 +550,9 @@ st.plotly_chart(fig_cust, use_container_width=True)
 # BRAND AWARENESS & SENTIMENT
 st.subheader("Brand Awareness & Sentiment")
 
-sentiment_counts = reviews_df.groupby(["Brand", "Sentiment"]).size().reset_index(name="Count")
+sentiment_counts = reviews_df.groupby(
+    ["Brand", "Sentiment"], observed=True, sort=False
+).size().reset_index(name="Count").sort_values(["Brand", "Sentiment"])
 fig_sentiment = px.bar(
     sentiment_counts, x="Brand", y="Count", color="Sentiment",
     title="Customer Review Sentiment by Brand",
@@ -370,7 +563,7 @@ st.plotly_chart(fig_sentiment, use_container_width=True)
 # SOCIAL MEDIA PERFORMANCE
 st.subheader("Social Media Engagement")
 
-social_summary = social_df.groupby(["Brand", "Platform"]).agg({
+social_summary = social_df.groupby(["Brand", "Platform"], observed=True, sort=False).agg({
     "EngagementRate": "mean",
     "Followers": "max"
 }).reset_index()